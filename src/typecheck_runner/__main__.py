@@ -2,6 +2,6 @@
 
 from __future__ import annotations
 
-from typecheck_runner.typecheck_runner import main
+from typecheck_runner.typecheck_runner import cli
 
-raise SystemExit(main())
+raise SystemExit(cli())
@@ -11,25 +11,36 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import shlex
-import shutil
+import signal
 import subprocess
 import sys
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing, suppress
+from functools import cache, lru_cache
 from pathlib import Path
+from threading import Event, Lock
 from time import perf_counter
-from typing import TYPE_CHECKING
-
-from packaging.requirements import Requirement
+from typing import TYPE_CHECKING, NoReturn, cast
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Generator, Sequence
     from logging import Logger
+    from typing import IO
+
+    from packaging.requirements import Requirement
 
 
 FORMAT = "[typecheck-runner %(levelname)s] %(message)s"
 logger: Logger = logging.getLogger(__name__)
 
+_DEFAULT_PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+_DEFAULT_PYTHON_EXECUTABLE = Path(sys.executable)
+
+_VENV_PYTHON_NAME = "python.exe" if sys.platform.startswith("win") else "python"
+
 
 # * Utilities -----------------------------------------------------------------
 def _setup_logging(
@@ -60,9 +71,9 @@ def _infer_venv_location() -> Path:
             return Path(venv).absolute()
 
     for d in (".venv",):
-        if (path := Path(d)).is_dir():
-            logger.debug("Inferred venv location %s", path)
-            return path.absolute()
+        if os.path.isdir(d):  # ruff:ignore[os-path-isdir]
+            logger.debug("Inferred venv location %s", d)
+            return Path(d).absolute()
 
     msg = "Could not infer virtual environment"
     raise ValueError(msg)
@@ -71,11 +82,13 @@ def _infer_venv_location() -> Path:
 def _get_python_executable_from_venv(
     location: Path,
 ) -> Path:
-    executable = "python.exe" if sys.platform.startswith("win") else "python"
+    loc = os.fspath(location)
     for d in ("bin", "Scripts"):
-        if (path := location / d / executable).exists():
+        path = os.path.join(loc, d, _VENV_PYTHON_NAME)  # ruff:ignore[os-path-join]
+        if os.path.isfile(path):  # ruff:ignore[os-path-isfile]
             logger.debug("Inferred python-executable %s", path)
-            return path.absolute()
+            # not abspath: collapsing ".." would ignore symlinks
+            return Path(path).absolute()
 
     msg = f"No virtual environment found under {location}"
     raise ValueError(msg)
@@ -95,6 +108,18 @@ def _get_python_executable(
     return python_executable
 
 
+@lru_cache(maxsize=8)
+def _probe_python_version(python_executable: Path) -> str:
+    logger.debug("Calculate python-version from executable %s", python_executable)
+    script = "import sys; info = sys.version_info; print(f'{info.major}.{info.minor}')"
+    return (
+        subprocess
+        .check_output([python_executable, "-c", script])
+        .decode("utf-8")
+        .strip()
+    )
+
+
 def _get_python_values(
     python_version: str | None,
     python_executable: Path | None,
@@ -104,125 +129,296 @@ def _get_python_values(
     if python_version is None and not no_python_version:
         if python_executable is not None:
             # infer python version from python_executable
-            logger.debug(
-                "Calculate python-version from executable %s", python_executable
-            )
-            script = "import sys; info = sys.version_info; print(f'{info.major}.{info.minor}')"
-            python_version = (
-                subprocess
-                .check_output([python_executable, "-c", script])
-                .decode("utf-8")
-                .strip()
-            )
+            python_version = _probe_python_version(python_executable)
         else:
-            python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+            python_version = _DEFAULT_PYTHON_VERSION
 
     if python_executable is None and not no_python_executable:
-        python_executable = Path(sys.executable)
+        python_executable = _DEFAULT_PYTHON_EXECUTABLE
 
     return python_version, python_executable
 
 
+_CHECK_PREFIX_CHECKERS = frozenset(("ty", "pyrefly"))
+
+
 def _maybe_add_check_argument(checker: str, args: list[str]) -> list[str]:
-    if checker in {"ty", "pyrefly"} and not args:
+    if not args and checker in _CHECK_PREFIX_CHECKERS:
         return ["check"]
     return args
 
 
+# Characters for which ``shlex.split`` and ``str.split`` differ on ascii input
+_SHLEX_SPECIAL_CHARS = re.compile(r"[\"'\\\x0b\x0c\x1c-\x1f]")
+
+
+@cache
+def _shlex_split(s: str) -> tuple[str, ...]:
+    if s.isascii() and _SHLEX_SPECIAL_CHARS.search(s) is None:
+        # fast path: no quoting or escapes
+        return tuple(s.split())
+    return tuple(shlex.split(s))
+
+
+@lru_cache(maxsize=64)
+def _which(cmd: str, path: str | None) -> str | None:
+    # ``path`` (the current ``PATH``) is part of the cache key so lookups
+    # follow changes to the environment.
+    # deferred: only needed for --no-uvx checkers
+    import shutil
+
+    return shutil.which(cmd, path=path)
+
+
+@cache
+def _get_requirement(spec: str) -> Requirement:
+    # deferred: only needed for uvx checkers
+    from packaging.requirements import Requirement
+
+    return Requirement(spec)
+
+
 def _parse_command(
     command: str,
     no_uvx: bool,
     uvx_delimiter: str,
-    uvx_options: Sequence[str],
-) -> tuple[str, list[str]]:
-    command, *args = shlex.split(command)
+    uvx_options: tuple[str, ...],
+) -> tuple[str, tuple[str, ...]]:
+    command, *args = _shlex_split(command)
 
     if no_uvx:
         path = Path(command).expanduser()
         checker = path.name
         path_str = str(path)
 
-        if path_which := shutil.which(path_str):
+        if path_which := _which(path_str, os.environ.get("PATH")):
             path_str = str(Path(path_which))
 
-        return checker, [
+        return checker, (
             path_str,
             *_maybe_add_check_argument(checker, args),
-        ]
+        )
 
-    req = Requirement(command)
-    checker = req.name
+    checker = _get_requirement(command).name
 
     idx = args.index(uvx_delimiter) if uvx_delimiter in args else len(args)
     checker_args = args[:idx]
     uvx_args = args[idx + 1 :]
 
-    args = [
+    return checker, (
         "uvx",
         *uvx_options,
         *uvx_args,
         command,
         *_maybe_add_check_argument(checker, checker_args),
-    ]
-    return checker, args
+    )
 
 
-PYRIGHT_LIKE_CHECKERS = {"pyright", "basedpyright"}
+PYRIGHT_LIKE_CHECKERS: frozenset[str] = frozenset(("pyright", "basedpyright"))
 
+_VERSION_FLAG_BY_CHECKER = dict.fromkeys(PYRIGHT_LIKE_CHECKERS, "pythonversion")
+_PYTHON_FLAG_BY_CHECKER = {
+    **dict.fromkeys(PYRIGHT_LIKE_CHECKERS, "pythonpath"),
+    "ty": "python",
+    "pyrefly": "python-interpreter-path",
+    "mypy": "python-executable",
+}
 
+
+@lru_cache(maxsize=32)
 def _get_python_flags(
     checker: str,
     python_version: str | None,
     python_executable: str | Path | None,
-) -> list[str]:
+) -> tuple[str, ...]:
     out: list[str] = []
     if python_version is not None:
-        version_flag = (
-            "pythonversion" if checker in PYRIGHT_LIKE_CHECKERS else "python-version"
-        )
+        version_flag = _VERSION_FLAG_BY_CHECKER.get(checker, "python-version")
         out.append(f"--{version_flag}={python_version}")
 
     if python_executable is not None:
-        if checker in PYRIGHT_LIKE_CHECKERS:
-            python_flag = "pythonpath"
-        elif checker == "ty":
-            python_flag = "python"
-        elif checker == "pyrefly":
-            python_flag = "python-interpreter-path"
-        elif checker == "mypy":
-            # default to mypy
-            python_flag = "python-executable"
-        else:
+        if (python_flag := _PYTHON_FLAG_BY_CHECKER.get(checker)) is None:
             msg = f"Unknown checker {checker}"
             raise ValueError(msg)
         out.append(f"--{python_flag}={python_executable}")
 
-    return out
+    return tuple(out)
 
 
-def _run_checker(
+def _spawn_checker(
     *args: str,
     dry_run: bool = False,
-) -> int:
-    cleaned_args = [os.fsdecode(arg) for arg in args]
-    full_cmd = shlex.join(cleaned_args)
-    logger.info("Command: %s", full_cmd)
+    capture_output: bool = False,
+) -> subprocess.Popen[bytes] | None:
+    cleaned_args = list(args)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Command: %s", shlex.join(cleaned_args))
 
     if dry_run:
-        return 0
+        return None
+
+    if capture_output:
+        # new session, so _terminate_checker can signal any processes the
+        # checker starts (uvx, node shims) along with it
+        return subprocess.Popen(
+            cleaned_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    return subprocess.Popen(cleaned_args)
+
+
+def _terminate_checker(proc: subprocess.Popen[bytes]) -> None:
+    """Terminate a checker started with ``capture_output=True``."""
+    if os.name == "posix":
+        # a grandchild holding the output pipe open would otherwise outlive
+        # the checker and block the reader
+        with suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGTERM)
+    else:
+        proc.terminate()
+
+
+def _start_timer() -> float | None:
+    """Start time for ``_wait_checker``, or ``None`` if timing is not logged."""
+    return perf_counter() if logger.isEnabledFor(logging.INFO) else None
 
-    start_time = perf_counter()
-    returncode = subprocess.call(cleaned_args)
-    logger.info("Execution time: %s", perf_counter() - start_time)
+
+def _wait_checker(proc: subprocess.Popen[bytes], start_time: float | None) -> int:
+    try:
+        returncode = proc.wait()
+    except BaseException:
+        # e.g. KeyboardInterrupt: don't leave the checker running
+        proc.kill()
+        _ = proc.wait()
+        raise
+    if start_time is not None:
+        logger.info("Execution time: %s", perf_counter() - start_time)
     if returncode:
         logger.error("Failed with exit code: %s", returncode)
 
     return returncode
 
 
+def _exec_checker(*args: str) -> NoReturn:
+    """Replace the current process with the checker."""
+    cleaned_args = list(args)
+    _ = sys.stdout.flush()
+    _ = sys.stderr.flush()
+    os.execvp(cleaned_args[0], cleaned_args)  # ruff:ignore[start-process-with-no-shell]
+
+
+def _run_checker(
+    *args: str,
+    dry_run: bool = False,
+    replace_process: bool = False,
+) -> int:
+    # Nothing is left to do after the last checker, so exec it directly
+    # (skipping fork/wait) unless timing information would be logged.
+    if (
+        replace_process
+        and not dry_run
+        and os.name == "posix"
+        and not logger.isEnabledFor(logging.INFO)
+    ):
+        _exec_checker(*args)
+
+    start_time = _start_timer()
+    if (proc := _spawn_checker(*args, dry_run=dry_run)) is None:
+        return 0
+    return _wait_checker(proc, start_time)
+
+
+# _XOPEN_IOV_MAX, the smallest IOV_MAX allowed by POSIX.
+_WRITEV_BATCH_SIZE = 16
+
+
+def _write_output(chunks: Sequence[bytes]) -> None:
+    """Write captured checker output to stdout using batched ``os.writev`` calls."""
+    _ = sys.stdout.flush()
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        # stdout is not backed by a file descriptor (e.g., redirected in-process)
+        _ = sys.stdout.write(b"".join(chunks).decode(errors="replace"))
+        return
+
+    for start in range(0, len(chunks), _WRITEV_BATCH_SIZE):
+        batch = chunks[start : start + _WRITEV_BATCH_SIZE]
+        written = 0
+        if hasattr(os, "writev"):
+            written = os.writev(fd, batch)
+            if written == sum(map(len, batch)):
+                continue
+
+        # partial write or no ``os.writev`` (windows)
+        remaining = memoryview(b"".join(batch))[written:]
+        while remaining:
+            remaining = remaining[os.write(fd, remaining) :]
+
+
+def _iter_checker_codes_parallel(
+    commands: Sequence[Sequence[str]],
+    jobs: int,
+    dry_run: bool = False,
+) -> Generator[int]:
+    """
+    Run checkers concurrently, yielding exit codes as checkers complete.
+
+    Output of each checker is captured and written as a single block once the
+    checker finishes, so output from concurrent checkers is not interleaved.
+    If the consumer stops early (``--fail-fast``), pending checkers are
+    cancelled and running checkers are terminated.
+
+    Yields
+    ------
+    int
+        Exit code of each checker, in order of completion.
+    """
+    processes: list[subprocess.Popen[bytes]] = []
+    lock = Lock()
+    output_lock = Lock()
+    stopped = Event()
+
+    def _run(args: Sequence[str]) -> int:
+        start_time = _start_timer()
+        with lock:
+            if stopped.is_set():
+                return 0
+            proc = _spawn_checker(*args, dry_run=dry_run, capture_output=True)
+            if proc is None:
+                return 0
+            processes.append(proc)
+
+        with cast("IO[bytes]", proc.stdout) as stdout:
+            lines = stdout.readlines()
+        if stopped.is_set():
+            # terminated by fail-fast, so its exit code is not a failure to report
+            return proc.wait()
+        if lines:
+            with output_lock:
+                _write_output(lines)
+        return _wait_checker(proc, start_time)
+
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(_run, args) for args in commands]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        with lock:
+            stopped.set()
+            for proc in processes:
+                if proc.poll() is None:
+                    _terminate_checker(proc)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 # * Application ---------------------------------------------------------------
+@cache
 def get_parser() -> ArgumentParser:
-    """Get argparser."""
+    """Get argparser. The parser is built once and reused."""
     parser = ArgumentParser(description="Run executable using uvx.")
     _ = parser.add_argument("--version", action="store_true", help="Display version.")
 
@@ -334,6 +530,18 @@ def get_parser() -> ArgumentParser:
         they fail.
         """,
     )
+    _ = parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="""
+        Number of checkers to run concurrently. Pass ``0`` to use the number of
+        CPUs. Default is to run checkers serially. When running concurrently,
+        the output (stdout and stderr) of each checker is written to stdout
+        once that checker finishes.
+        """,
+    )
     _ = parser.add_argument(
         "--dry-run", action="store_true", help="""Perform dry run."""
     )
@@ -373,11 +581,21 @@ def get_parser() -> ArgumentParser:
     return parser
 
 
-def main(args: Sequence[str] | None = None) -> int:
-    """Main script."""
+def main(args: Sequence[str] | None = None, *, replace_process: bool = False) -> int:
+    """
+    Main script.
+
+    If ``replace_process`` is ``True`` and a single checker is run (without
+    ``--allow-errors``), the current process is replaced by the checker (POSIX
+    only), so this function does not return. Only entry points that exit with
+    the result should pass it.
+    """
     parser = get_parser()
     options = parser.parse_args(args)
 
+    if options.jobs < 0:
+        parser.error(f"argument -j/--jobs: must be non-negative, got {options.jobs}")
+
     if options.version:
         from typecheck_runner import __version__
 
@@ -405,12 +623,12 @@ def main(args: Sequence[str] | None = None) -> int:
     logger.debug("checkers: %s", options.checkers)
     logger.debug("args: %s", options.args)
 
-    uvx_options = [
-        *shlex.split(options.uvx_options),
-        *(f"--constraints={c}" for c in options.constraints),
-    ]
+    uvx_options = (
+        *_shlex_split(options.uvx_options),
+        *(f"--constraints={c}" for c in dict.fromkeys(options.constraints)),
+    )
 
-    code = 0
+    commands: list[list[str]] = []
     for command in options.checkers:
         checker, args = _parse_command(
             command,
@@ -419,19 +637,43 @@ def main(args: Sequence[str] | None = None) -> int:
             uvx_options=uvx_options,
         )
         logger.info("Checker: %s", checker)
-        checker_code = _run_checker(
+        commands.append([
             *args,
             *_get_python_flags(checker, python_version, python_executable),
             *options.args,
-            dry_run=options.dry_run,
+        ])
+
+    jobs = min(options.jobs or os.cpu_count() or 1, len(commands))
+    # a single checker's exit code is the result, so it can replace this process
+    replace_process = (
+        replace_process and len(commands) == 1 and not options.allow_errors
+    )
+    checker_codes = (
+        _iter_checker_codes_parallel(commands, jobs=jobs, dry_run=options.dry_run)
+        if jobs > 1
+        else (
+            _run_checker(
+                *args, dry_run=options.dry_run, replace_process=replace_process
+            )
+            for args in commands
         )
-        if options.fail_fast and checker_code:
-            return checker_code
+    )
 
-        code += checker_code
+    code = 0
+    with closing(checker_codes):
+        for checker_code in checker_codes:
+            if options.fail_fast and checker_code:
+                return checker_code
+
+            code += checker_code
 
     return 0 if options.allow_errors else code
 
 
+def cli() -> int:
+    """Console script entry point. A lone checker replaces the process."""
+    return main(replace_process=True)
+
+
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(cli())
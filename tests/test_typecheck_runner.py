@@ -2,21 +2,27 @@
 # pylint: disable=protected-access,use-implicit-booleaness-not-comparison-to-zero
 from __future__ import annotations
 
-import contextlib
+import io
 import os
 import re
+import runpy
+import shlex
+import signal
+import subprocess
 import sys
 from logging import WARNING
 from pathlib import Path
+from threading import Event
+from time import perf_counter
 from typing import TYPE_CHECKING
-from unittest.mock import call, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from typecheck_runner import typecheck_runner
+from typecheck_runner import __version__, typecheck_runner
 
 if TYPE_CHECKING:
-    from collections.abc import Generator, Sequence
+    from collections.abc import Sequence
     from typing import Any
 
 
@@ -24,17 +30,52 @@ def _pathify(x: str | Path | None) -> Path | None:
     return x if x is None else Path(x)
 
 
-def _dummy_which(x: str) -> str:
+def _dummy_which(x: str, path: str | None = None) -> str:  # ruff:ignore[unused-function-argument]
     return "/hello/" + x
 
 
-def _identity(x: Any) -> Any:
+def _identity_which(x: str, path: str | None = None) -> str:  # ruff:ignore[unused-function-argument]
     return x
 
 
-def test_version() -> None:
-    from typecheck_runner import __version__
+def _no_which(x: str, path: str | None = None) -> None:  # ruff:ignore[unused-function-argument]
+    return None
+
+
+class _RecordingStub:
+    """Callable recording its calls, without the overhead of ``MagicMock``."""
+
+    def __init__(self, return_value: Any) -> None:
+        self.return_value = return_value
+        self.call_args_list: list[Any] = []
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.call_args_list.append(call(*args, **kwargs))
+        return self.return_value
+
+
+@pytest.fixture
+def _clear_caches() -> None:
+    # results depend on patched ``shutil.which``
+    typecheck_runner._which.cache_clear()
+
+
+pytestmark = pytest.mark.usefixtures("_clear_caches")
+
+_DEFAULT_PYTHON_VALUES = typecheck_runner._get_python_values(None, None, False, False)
+_MYPY_FLAGS = typecheck_runner._get_python_flags("mypy", *_DEFAULT_PYTHON_VALUES)
+_PYRIGHT_FLAGS = typecheck_runner._get_python_flags("pyright", *_DEFAULT_PYTHON_VALUES)
+_HOME_MYPY = str(Path("~/mypy").expanduser())
+
 
+@pytest.fixture
+def mocked_logger(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    logger = MagicMock()
+    monkeypatch.setattr(typecheck_runner, "logger", logger)
+    return logger
+
+
+def test_version() -> None:
     assert isinstance(__version__, str)
     assert re.match(r"^\d+\.\d+\.\d+.*$", __version__) is not None
 
@@ -44,15 +85,14 @@ def test_version() -> None:
     [-1, 0, 1, 2],
 )
 @pytest.mark.parametrize("stdout", [False, True])
-@patch("typecheck_runner.typecheck_runner.logger", autospec=True)
-def test__setup_logging(mocked_logger: Any, stdout: bool, verbosity: int) -> None:
+def test__setup_logging(mocked_logger: MagicMock, stdout: bool, verbosity: int) -> None:
     expected = max(0, WARNING - 10 * verbosity)
-    typecheck_runner._setup_logging(verbosity, stdout)
+    with patch("logging.basicConfig") as mocked_basic_config:
+        typecheck_runner._setup_logging(verbosity, stdout)
     mocked_logger.setLevel.assert_called_once_with(expected)
-    mocked_logger.setLevel.assert_called_with(expected)
-    assert mocked_logger.setLevel.call_args_list == [
-        call(expected),
-    ]
+
+    handlers = mocked_basic_config.call_args.kwargs.get("handlers", [])
+    assert [handler.stream for handler in handlers] == ([sys.stdout] if stdout else [])
 
 
 def make_fake_venv(
@@ -74,117 +114,135 @@ def make_fake_venv(
 
 
 @pytest.fixture
-def example_path(tmp_path: Path) -> Generator[Path]:
-    old_cwd = Path.cwd()
-    os.chdir(tmp_path)
+def example_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
 
-    yield tmp_path
 
-    os.chdir(old_cwd)
+@pytest.fixture
+def _clean_venv_environ(monkeypatch: pytest.MonkeyPatch) -> None:
+    for key in ("VIRTUAL_ENV", "CONDA_PREFIX"):
+        monkeypatch.delenv(key, raising=False)
 
 
 @pytest.mark.parametrize(
     ("venv", "environ", "expected"),
     [
-        (None, {"VIRTUAL_ENV": "/virtual/env"}, contextlib.nullcontext("/virtual/env")),
-        (None, {"CONDA_PREFIX": "/conda/env"}, contextlib.nullcontext("/conda/env")),
+        (None, {"VIRTUAL_ENV": "/virtual/env"}, "/virtual/env"),
+        (None, {"CONDA_PREFIX": "/conda/env"}, "/conda/env"),
+        (None, {"VIRTUAL_ENV": "/virtual/link/../env"}, "/virtual/link/../env"),
         (
             ".venv",
             {"VIRTUAL_ENV": "/virtual/env", "CONDA_PREFIX": "/conda/env"},
-            contextlib.nullcontext("/virtual/env"),
-        ),
-        (
-            None,
-            {},
-            pytest.raises(ValueError, match=r"Could not infer virtual environment.*"),
+            "/virtual/env",
         ),
-        (".venv", {}, contextlib.nullcontext(".venv")),
+        (".venv", {}, ".venv"),
     ],
 )
+@pytest.mark.usefixtures("_clean_venv_environ")
 def test__infer_venv_location(
-    example_path: Path, venv: str | None, environ: dict[str, str], expected: Any
+    monkeypatch: pytest.MonkeyPatch,
+    example_path: Path,
+    venv: str | None,
+    environ: dict[str, str],
+    expected: str,
 ) -> None:
     if venv:
         (example_path / venv).mkdir()
 
-    with (
-        patch.dict("typecheck_runner.typecheck_runner.os.environ", environ, clear=True),
-        expected as e,
-    ):
-        out = typecheck_runner._infer_venv_location()
-        assert out == Path(e).absolute()
+    for key, value in environ.items():
+        monkeypatch.setenv(key, value)
+
+    assert typecheck_runner._infer_venv_location() == example_path / expected
+
+
+@pytest.mark.usefixtures("_clean_venv_environ", "example_path")
+def test__infer_venv_location_missing() -> None:
+    with pytest.raises(ValueError, match=r"Could not infer virtual environment.*"):
+        _ = typecheck_runner._infer_venv_location()
+
+
+@pytest.fixture
+def windows(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    is_windows: bool = request.param
+    monkeypatch.setattr(
+        typecheck_runner, "_VENV_PYTHON_NAME", "python.exe" if is_windows else "python"
+    )
+    return is_windows
 
 
 venv_marks = pytest.mark.parametrize(
     ("windows", "venv", "location", "expected"),
     [
-        (
-            False,
-            ".venv",
-            ".venv",
-            contextlib.nullcontext(".venv/bin/python"),
-        ),
-        (
-            False,
-            ".venv",
-            "venv",
-            pytest.raises(ValueError, match=r"No virtual environment.*"),
-        ),
-        (
-            True,
-            ".venv",
-            ".venv",
-            contextlib.nullcontext(".venv/Scripts/python.exe"),
-        ),
-        (
-            False,
-            ".nox/test",
-            ".nox/test",
-            contextlib.nullcontext(".nox/test/bin/python"),
-        ),
+        (False, ".venv", ".venv", ".venv/bin/python"),
+        (True, ".venv", ".venv", ".venv/Scripts/python.exe"),
+        (False, ".nox/test", ".nox/test", ".nox/test/bin/python"),
     ],
+    indirect=["windows"],
 )
 
 
 @venv_marks
 def test__get_python_executable_from_venv_no_cd(
-    tmp_path: Path, windows: bool, venv: str, location: str, expected: Any
+    tmp_path: Path, windows: bool, venv: str, location: str, expected: str
 ) -> None:
     make_fake_venv(windows, tmp_path, venv)
 
     path = tmp_path.joinpath(location)
 
-    with (
-        patch(
-            "typecheck_runner.typecheck_runner.sys.platform",
-            "windows" if windows else "darwin",
-        ),
-        expected as e,
-    ):
-        assert typecheck_runner._get_python_executable_from_venv(
-            path
-        ) == tmp_path.absolute().joinpath(e)
+    assert typecheck_runner._get_python_executable_from_venv(path) == tmp_path.joinpath(
+        expected
+    )
 
 
 @venv_marks
 def test__get_python_executable_from_venv_cd(
-    example_path: Path, windows: bool, venv: str, location: str, expected: Any
+    example_path: Path, windows: bool, venv: str, location: str, expected: str
 ) -> None:
     make_fake_venv(windows, example_path, venv)
 
     path = Path(location)
 
-    with (
-        patch(
-            "typecheck_runner.typecheck_runner.sys.platform",
-            "windows" if windows else "darwin",
-        ),
-        expected as e,
-    ):
-        assert (
-            typecheck_runner._get_python_executable_from_venv(path)
-            == Path(e).absolute()
-        )
+    assert (
+        typecheck_runner._get_python_executable_from_venv(path)
+        == example_path / expected
+    )
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="needs symlinks")
+def test__get_python_executable_from_venv_symlink_parent(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # "link/.." is "real", not tmp_path
+    monkeypatch.setattr(typecheck_runner, "_VENV_PYTHON_NAME", "python")
+    tmp_path.joinpath("real", "a").mkdir(parents=True)
+    tmp_path.joinpath("link").symlink_to(tmp_path / "real" / "a")
+    make_fake_venv(False, tmp_path / "real", "env")
+
+    out = typecheck_runner._get_python_executable_from_venv(
+        tmp_path / "link" / ".." / "env"
+    )
+    assert out == tmp_path / "link" / ".." / "env" / "bin" / "python"
+    assert out.is_file()
+
+
+@pytest.mark.parametrize("location", ["venv", "/does/not/exist"])
+def test__get_python_executable_from_venv_missing(
+    example_path: Path, location: str
+) -> None:
+    make_fake_venv(False, example_path, ".venv")
+
+    with pytest.raises(ValueError, match=r"No virtual environment.*"):
+        _ = typecheck_runner._get_python_executable_from_venv(Path(location))
+
+
+@pytest.fixture(scope="session")
+def venv_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # read-only venvs shared by tests which only probe them
+    root = tmp_path_factory.mktemp("venv_template")
+    make_fake_venv(False, root, ".venv")
+    make_fake_venv(False, root, ".nox/test")
+    return root
 
 
 @pytest.mark.parametrize(
@@ -197,48 +255,49 @@ def test__get_python_executable_from_venv_cd(
         (None, None, True, ".venv/bin/python"),
     ],
 )
+@pytest.mark.usefixtures("_clean_venv_environ")
 def test__get_python_executable(
-    example_path: Path,
+    venv_template: Path,
+    monkeypatch: pytest.MonkeyPatch,
     python_executable: str | None,
     venv: str | None,
     infer_venv: bool,
     expected: str | None,
 ) -> None:
-    make_fake_venv(False, example_path, ".venv")
-
-    if venv is not None and venv != ".venv":
-        make_fake_venv(False, example_path, venv)
+    monkeypatch.chdir(venv_template)
+    monkeypatch.setattr(typecheck_runner, "_VENV_PYTHON_NAME", "python")
 
-    with (
-        patch.dict("typecheck_runner.typecheck_runner.os.environ", {}, clear=True),
-        patch("typecheck_runner.typecheck_runner.sys.platform", "darwin"),
-    ):
-        out = typecheck_runner._get_python_executable(
-            _pathify(python_executable), _pathify(venv), infer_venv
-        )
+    out = typecheck_runner._get_python_executable(
+        _pathify(python_executable), _pathify(venv), infer_venv
+    )
 
-        if expected is None:
-            assert out is None
-        else:
-            assert out == Path(expected).absolute()
+    if expected is None:
+        assert out is None
+    else:
+        assert out == venv_template / expected
 
 
 @pytest.mark.parametrize(
-    ("python_version", "no_python_version", "expected_python_version"),
+    (
+        "python_version",
+        "no_python_version",
+        "expected_python_version",
+        "python_executable",
+        "no_python_executable",
+        "expected_python_executable",
+    ),
     [
-        (None, False, "infer"),
-        (None, True, None),
-        ("3.2", False, "3.2"),
-        ("3.2", True, "3.2"),
-    ],
-)
-@pytest.mark.parametrize(
-    ("python_executable", "no_python_executable", "expected_python_executable"),
-    [
-        (None, False, "infer"),
-        (None, True, None),
-        (sys.executable, False, sys.executable),
-        (sys.executable, True, sys.executable),
+        # python version
+        (None, False, "infer", None, True, None),
+        (None, True, None, None, True, None),
+        ("3.2", False, "3.2", None, True, None),
+        ("3.2", True, "3.2", None, True, None),
+        # python executable
+        ("3.2", False, "3.2", None, False, "infer"),
+        ("3.2", False, "3.2", sys.executable, False, sys.executable),
+        ("3.2", False, "3.2", sys.executable, True, sys.executable),
+        # python version probed from python executable
+        (None, False, "infer", sys.executable, False, sys.executable),
     ],
 )
 def test__get_python_values(
@@ -263,9 +322,22 @@ def test__get_python_values(
     ) == (expected_python_version, _pathify(expected_python_executable))
 
 
-@pytest.mark.parametrize(
-    ("checker", "args", "expected"),
-    [
+def test__probe_python_version_cached() -> None:
+    typecheck_runner._probe_python_version.cache_clear()
+    with patch(
+        "typecheck_runner.typecheck_runner.subprocess.check_output",
+        return_value=b"3.8\n",
+    ) as mocked_check_output:
+        for _ in range(2):
+            assert typecheck_runner._probe_python_version(Path("/a/python")) == "3.8"
+    mocked_check_output.assert_called_once()
+    typecheck_runner._probe_python_version.cache_clear()
+
+
+def test__maybe_add_check_argument() -> None:
+    # pure table of cases, checked in a single test
+    for checker, args, expected in [
+        ("mypy", [], []),
         ("mypy", ["a", "b", "c"], ["a", "b", "c"]),
         ("ty", [], ["check"]),
         ("ty", ["a", "b", "c"], ["a", "b", "c"]),
@@ -274,12 +346,27 @@ def test__get_python_values(
         ("pyrefly", ["--verbose"], ["--verbose"]),
         ("pyrefly", ["--verbose", "check"], ["--verbose", "check"]),
         ("pyrefly", ["--verbose", "suppress"], ["--verbose", "suppress"]),
+    ]:
+        out = typecheck_runner._maybe_add_check_argument(checker, args)
+        assert out == expected, (checker, args)
+
+
+@pytest.mark.parametrize(
+    "s",
+    [
+        "",
+        "mypy",
+        "  mypy --verbose\t-a\n-b ",
+        "mypy -- --from mypy[faster-cache]",
+        "mypy --config='a b.toml'",
+        'mypy --config="a b.toml"',
+        "mypy a\\ b",
+        "mypy\x0ba",
+        "mypy caf\u00e9\u00a0x",
     ],
 )
-def test__maybe_add_check_argument(
-    checker: str, args: list[str], expected: list[str]
-) -> None:
-    assert typecheck_runner._maybe_add_check_argument(checker, args) == expected
+def test__shlex_split(s: str) -> None:
+    assert typecheck_runner._shlex_split(s) == tuple(shlex.split(s))
 
 
 @pytest.mark.parametrize(
@@ -288,65 +375,65 @@ def test__maybe_add_check_argument(
         pytest.param(
             "mypy",
             None,
-            [],
+            (),
             "mypy",
-            ["uvx", "mypy"],
+            ("uvx", "mypy"),
             id="basic",
         ),
         pytest.param(
             "mypy",
             None,
-            ["--verbose"],
+            ("--verbose",),
             "mypy",
-            ["uvx", "--verbose", "mypy"],
+            ("uvx", "--verbose", "mypy"),
             id="with uvx_options",
         ),
         pytest.param(
             "mypy --verbose -a -b",
             None,
-            [],
+            (),
             "mypy",
-            ["uvx", "mypy", "--verbose", "-a", "-b"],
+            ("uvx", "mypy", "--verbose", "-a", "-b"),
             id="with checker options",
         ),
         pytest.param(
             "mypy -- --from mypy[faster-cache]",
             "--",
-            [],
+            (),
             "mypy",
-            ["uvx", "--from", "mypy[faster-cache]", "mypy"],
+            ("uvx", "--from", "mypy[faster-cache]", "mypy"),
             id="with checker uvx options",
         ),
         pytest.param(
             "mypy ;; --from mypy[faster-cache]",
             ";;",
-            ["--verbose"],
+            ("--verbose",),
             "mypy",
-            ["uvx", "--verbose", "--from", "mypy[faster-cache]", "mypy"],
+            ("uvx", "--verbose", "--from", "mypy[faster-cache]", "mypy"),
             id="with checker uvx options delimiter",
         ),
         pytest.param(
             "mypy[faster-cache] -a",
             None,
-            ["--verbose"],
+            ("--verbose",),
             "mypy",
-            ["uvx", "--verbose", "mypy[faster-cache]", "-a"],
+            ("uvx", "--verbose", "mypy[faster-cache]", "-a"),
             id="with optional extras",
         ),
         pytest.param(
             "ty",
             None,
-            ["--verbose"],
+            ("--verbose",),
             "ty",
-            ["uvx", "--verbose", "ty", "check"],
+            ("uvx", "--verbose", "ty", "check"),
             id="with optional extras add check",
         ),
         pytest.param(
             "ty check -a",
             None,
-            ["--verbose"],
+            ("--verbose",),
             "ty",
-            ["uvx", "--verbose", "ty", "check", "-a"],
+            ("uvx", "--verbose", "ty", "check", "-a"),
             id="with optional extras add check",
         ),
     ],
@@ -354,9 +441,9 @@ def test__maybe_add_check_argument(
 def test__parser_command_uvx(
     command: str,
     uvx_delimiter: str,
-    uvx_options: Sequence[str],
+    uvx_options: tuple[str, ...],
     expected_command: str,
-    expected_args: list[str],
+    expected_args: tuple[str, ...],
 ) -> None:
     assert typecheck_runner._parse_command(
         command, False, uvx_delimiter, uvx_options
@@ -369,70 +456,108 @@ def test__parser_command_uvx(
         pytest.param(
             "mypy",
             "mypy",
-            ["/hello/mypy"],
+            ("/hello/mypy",),
             id="basic",
         ),
         pytest.param(
             "mypy --verbose -a",
             "mypy",
-            ["/hello/mypy", "--verbose", "-a"],
+            ("/hello/mypy", "--verbose", "-a"),
             id="with options",
         ),
         pytest.param(
             "/path/to/mypy",
             "mypy",
-            ["/hello/path/to/mypy"],
+            ("/hello/path/to/mypy",),
             id="path",
         ),
+        pytest.param(
+            "./mypy",
+            "mypy",
+            ("/hello/mypy",),
+            id="path dot",
+        ),
+        pytest.param(
+            "tools/../mypy",
+            "mypy",
+            ("/hello/tools/../mypy",),
+            id="path parent not collapsed",
+        ),
         pytest.param(
             "~/mypy",
             "mypy",
-            ["/hello/" + str(Path("~/mypy").expanduser())],
+            ("/hello/" + _HOME_MYPY,),
             id="expanduser",
         ),
         pytest.param(
             "/path/to/mypy -b --c",
             "mypy",
-            ["/hello/path/to/mypy", "-b", "--c"],
+            ("/hello/path/to/mypy", "-b", "--c"),
             id="path with options",
         ),
         pytest.param(
             "/path/to/ty",
             "ty",
-            ["/hello/path/to/ty", "check"],
+            ("/hello/path/to/ty", "check"),
             id="path with options ty no check",
         ),
         pytest.param(
             "/path/to/ty check -b --c",
             "ty",
-            ["/hello/path/to/ty", "check", "-b", "--c"],
+            ("/hello/path/to/ty", "check", "-b", "--c"),
             id="path with options ty check",
         ),
     ],
 )
-@patch("typecheck_runner.typecheck_runner.shutil.which", side_effect=_dummy_which)
 def test__parse_command_no_uvx(
-    mock_which: Any,  # ruff:ignore[unused-function-argument]
+    monkeypatch: pytest.MonkeyPatch,
     command: str,
     expected_command: str,
-    expected_args: list[str],
+    expected_args: tuple[str, ...],
 ) -> None:
-    args = [str(Path(expected_args[0])), *expected_args[1:]]
-    assert typecheck_runner._parse_command(command, True, "", []) == (
+    monkeypatch.setattr("shutil.which", _dummy_which)
+    args = (str(Path(expected_args[0])), *expected_args[1:])
+    assert typecheck_runner._parse_command(command, True, "", ()) == (
         expected_command,
         args,
     )
 
 
-def test__parse_command_no_uvx_no_which() -> None:
-    with patch(
-        "typecheck_runner.typecheck_runner.shutil.which",
-        side_effect=lambda x: None,  # pyright: ignore[reportUnknownLambdaType]  # ruff:ignore[unused-lambda-argument]
-    ):
-        assert typecheck_runner._parse_command("hello -b --c", True, "", []) == (
-            "hello",
-            ["hello", "-b", "--c"],
-        )
+def test__parse_command_no_uvx_which_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PATH", "/usr/bin")
+    with patch("shutil.which", side_effect=_dummy_which) as mocked_which:
+        for command in ("mypy src", "mypy tests"):
+            _ = typecheck_runner._parse_command(command, True, "", ())
+    mocked_which.assert_called_once_with("mypy", path="/usr/bin")
+
+
+def test__parse_command_no_uvx_follows_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    with patch("shutil.which", side_effect=_dummy_which) as mocked_which:
+        for path in ("/usr/bin", "/opt/bin"):
+            monkeypatch.setenv("PATH", path)
+            _ = typecheck_runner._parse_command("mypy", True, "", ())
+    assert mocked_which.call_args_list == [
+        call("mypy", path="/usr/bin"),
+        call("mypy", path="/opt/bin"),
+    ]
+
+
+def test__which_cache_follows_path() -> None:
+    with patch("shutil.which", side_effect=_dummy_which) as mocked_which:
+        for path in ("/usr/bin", "/opt/bin", "/usr/bin"):
+            _ = typecheck_runner._which("mypy", path)
+    assert mocked_which.call_args_list == [
+        call("mypy", path="/usr/bin"),
+        call("mypy", path="/opt/bin"),
+    ]
+
+
+def test__parse_command_no_uvx_no_which(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("shutil.which", _no_which)
+    assert typecheck_runner._parse_command("hello -b --c", True, "", ()) == (
+        "hello",
+        ("hello", "-b", "--c"),
+    )
 
 
 @pytest.mark.parametrize(
@@ -461,10 +586,9 @@ def test__get_python_flags(
     if python_executable:
         expected.append(f"--{python_flag}={python_executable}")
 
-    assert (
-        typecheck_runner._get_python_flags(checker, python_version, python_executable)
-        == expected
-    )
+    assert typecheck_runner._get_python_flags(
+        checker, python_version, python_executable
+    ) == tuple(expected)
 
 
 def test__get_python_flags_bad_checker() -> None:
@@ -473,194 +597,410 @@ def test__get_python_flags_bad_checker() -> None:
 
 
 @pytest.mark.parametrize(
-    "args",
+    ("args", "expected_args"),
     [
         pytest.param(
             ("mypy", "--verbose"),
+            ["mypy", "--verbose"],
             id="basic",
         ),
         pytest.param(
             ("uvx", "--verbose", "mypy", "--verbose", "src"),
+            ["uvx", "--verbose", "mypy", "--verbose", "src"],
             id="more",
         ),
     ],
 )
 @pytest.mark.parametrize("dry_run", [False, True])
 @pytest.mark.parametrize("return_value", [0, 10])
-@patch("typecheck_runner.typecheck_runner.logger", autospec=True)
 def test__run_checker(
-    mocked_logger: Any,
-    args: str,
+    monkeypatch: pytest.MonkeyPatch,
+    mocked_logger: MagicMock,
+    args: tuple[str, ...],
+    expected_args: list[str],
     dry_run: bool,
     return_value: int,
 ) -> None:
     expected = 0 if dry_run else return_value
-    with patch(
-        "typecheck_runner.typecheck_runner.subprocess.call",
-        autospec=True,
-        return_value=return_value,
-    ) as mocked_call:
-        assert typecheck_runner._run_checker(*args, dry_run=dry_run) == expected
-        assert (
-            mocked_logger.error.call_count == 0 if (dry_run or not return_value) else 1
-        )
+    mocked_popen = MagicMock()
+    mocked_popen.return_value.wait.return_value = return_value
+    monkeypatch.setattr(subprocess, "Popen", mocked_popen)
 
-        if dry_run:
-            assert mocked_call.call_args_list == []
-        else:
-            mocked_call.assert_called_once_with([os.fsdecode(arg) for arg in args])
+    assert typecheck_runner._run_checker(*args, dry_run=dry_run) == expected
+    assert mocked_logger.error.call_count == (0 if (dry_run or not return_value) else 1)
+
+    if dry_run:
+        assert not mocked_popen.call_args_list
+    else:
+        mocked_popen.assert_called_once_with(expected_args)
 
 
 @pytest.mark.parametrize(
-    ("checkers", "args", "expecteds"),
+    ("os_name", "verbosity", "dry_run", "expected"),
+    [
+        ("posix", 0, False, True),
+        ("posix", 1, False, False),
+        ("posix", 0, True, False),
+        ("nt", 0, False, False),
+    ],
+)
+def test__run_checker_replace_process(
+    monkeypatch: pytest.MonkeyPatch,
+    os_name: str,
+    verbosity: int,
+    dry_run: bool,
+    expected: bool,
+) -> None:
+    mocked_execvp = MagicMock()
+    mocked_popen = MagicMock()
+    mocked_popen.return_value.wait.return_value = 0
+    monkeypatch.setattr(os, "name", os_name)
+    monkeypatch.setattr(os, "execvp", mocked_execvp)
+    monkeypatch.setattr(subprocess, "Popen", mocked_popen)
+    monkeypatch.setattr(
+        typecheck_runner.logger, "isEnabledFor", MagicMock(return_value=verbosity > 0)
+    )
+
+    _ = typecheck_runner._run_checker(
+        "mypy", "src", dry_run=dry_run, replace_process=True
+    )
+
+    if expected:
+        mocked_execvp.assert_called_once_with("mypy", ["mypy", "src"])
+    else:
+        assert not mocked_execvp.call_args_list
+
+
+@pytest.mark.parametrize("info", [True, False])
+def test__wait_checker_timing(info: bool) -> None:
+    proc = MagicMock()
+    proc.wait.return_value = 0
+    with (
+        patch.object(typecheck_runner.logger, "isEnabledFor", return_value=info),
+        patch.object(typecheck_runner.logger, "info") as mocked_info,
+    ):
+        start_time = typecheck_runner._start_timer()
+        assert typecheck_runner._wait_checker(proc, start_time) == 0
+
+    assert (start_time is not None) is info
+    assert len(mocked_info.call_args_list) == int(info)
+
+
+def test__wait_checker_interrupted() -> None:
+    proc = MagicMock()
+    proc.wait.side_effect = [KeyboardInterrupt, -9]
+    with pytest.raises(KeyboardInterrupt):
+        _ = typecheck_runner._wait_checker(proc, None)
+    proc.kill.assert_called_once_with()
+    assert proc.wait.call_count == 2  # ruff:ignore[magic-value-comparison]
+
+
+@pytest.fixture
+def run_checker(monkeypatch: pytest.MonkeyPatch) -> _RecordingStub:
+    stub = _RecordingStub(0)
+    monkeypatch.setattr(typecheck_runner, "_run_checker", stub)
+    monkeypatch.setattr("shutil.which", _dummy_which)
+    return stub
+
+
+_MULT_ARGS = ("--check", "mypy", "--check", "pyright -v", "--no-uvx", "src")
+_MULT_EXPECTEDS = [
+    ("/hello/mypy", *_MYPY_FLAGS, "src"),
+    ("/hello/pyright", "-v", *_PYRIGHT_FLAGS, "src"),
+]
+
+
+@pytest.mark.parametrize(
+    ("args", "return_value", "expected", "expecteds"),
     [
         pytest.param(
-            ["mypy"],
             ("--check", "mypy", "--no-uvx", "src"),
-            [
-                (
-                    "/hello/mypy",
-                    *typecheck_runner._get_python_flags(
-                        "mypy",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                )
-            ],
+            0,
+            0,
+            [("/hello/mypy", *_MYPY_FLAGS, "src")],
             id="no_uvx",
         ),
         pytest.param(
-            ["mypy"],
             ("--check", "mypy --verbose", "src"),
-            [
-                (
-                    "uvx",
-                    "mypy",
-                    "--verbose",
-                    *typecheck_runner._get_python_flags(
-                        "mypy",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                )
-            ],
+            0,
+            0,
+            [("uvx", "mypy", "--verbose", *_MYPY_FLAGS, "src")],
             id="uvx",
         ),
         pytest.param(
-            ["mypy", "pyright"],
-            ("--check", "mypy", "--check", "pyright -v", "--no-uvx", "src"),
-            [
-                (
-                    "/hello/mypy",
-                    *typecheck_runner._get_python_flags(
-                        "mypy",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                ),
-                (
-                    "/hello/pyright",
-                    "-v",
-                    *typecheck_runner._get_python_flags(
-                        "pyright",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                ),
-            ],
-            id="mult",
+            (
+                "--check",
+                "mypy",
+                "--constraints",
+                "c.txt",
+                "--constraints",
+                "c.txt",
+                "src",
+            ),
+            0,
+            0,
+            [("uvx", "--constraints=c.txt", "mypy", *_MYPY_FLAGS, "src")],
+            id="duplicate constraints",
+        ),
+        pytest.param(
+            ("--check", "mypy", "--no-uvx", "--allow-errors", "src"),
+            1,
+            0,
+            [("/hello/mypy", *_MYPY_FLAGS, "src")],
+            id="allow_errors",
+        ),
+        pytest.param(_MULT_ARGS, 0, 0, _MULT_EXPECTEDS, id="mult"),
+        pytest.param(_MULT_ARGS, 1, 2, _MULT_EXPECTEDS, id="mult errors"),
+        pytest.param(
+            (*_MULT_ARGS, "--fail-fast"),
+            1,
+            1,
+            _MULT_EXPECTEDS[:1],
+            id="mult fail_fast",
         ),
     ],
 )
-@patch("typecheck_runner.typecheck_runner._run_checker", autospec=True, return_value=0)
-@patch("typecheck_runner.typecheck_runner.shutil.which", side_effect=_dummy_which)
 def test_main(
-    mocked_which: Any,  # ruff:ignore[unused-function-argument]
-    mocked_run_checker: Any,
-    checkers: list[str],
+    run_checker: _RecordingStub,
     args: Sequence[str],
+    return_value: int,
+    expected: int,
     expecteds: list[Any],
 ) -> None:
-    assert not typecheck_runner.main(args)
-    assert mocked_run_checker.call_args_list == [
-        call(*[str(Path(e[0])), *e[1:]], dry_run=False)
-        for checker, e in zip(checkers, expecteds, strict=True)
+    run_checker.return_value = return_value
+    assert typecheck_runner.main(args, replace_process=True) == expected
+    assert run_checker.call_args_list == [
+        call(
+            *[str(Path(e[0])), *e[1:]],
+            dry_run=False,
+            replace_process=(
+                args.count("--check") == 1 and "--allow-errors" not in args
+            ),
+        )
+        for e in expecteds
+    ]
+
+
+def test_main_no_replace_process(run_checker: _RecordingStub) -> None:
+    # in-process callers of ``main`` always get a return value
+    assert typecheck_runner.main(["--check", "mypy", "--no-uvx", "src"]) == 0
+    assert run_checker.call_args_list == [
+        call(
+            str(Path("/hello/mypy")),
+            *_MYPY_FLAGS,
+            "src",
+            dry_run=False,
+            replace_process=False,
+        )
     ]
 
 
+def test_cli(monkeypatch: pytest.MonkeyPatch) -> None:
+    mocked_main = _RecordingStub(0)
+    monkeypatch.setattr(typecheck_runner, "main", mocked_main)
+    assert typecheck_runner.cli() == 0
+    assert mocked_main.call_args_list == [call(replace_process=True)]
+
+
+def test_main_help(run_checker: _RecordingStub) -> None:
+    assert typecheck_runner.main([]) == 2  # ruff:ignore[magic-value-comparison]
+    assert not run_checker.call_args_list
+
+
+def test_main_negative_jobs(
+    run_checker: _RecordingStub, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit) as excinfo:
+        _ = typecheck_runner.main(["--check", "mypy", "--jobs", "-1"])
+    assert excinfo.value.code == 2  # ruff:ignore[magic-value-comparison]
+    assert "--jobs: must be non-negative" in capsys.readouterr().err
+    assert not run_checker.call_args_list
+
+
 @pytest.mark.parametrize(
-    ("checkers", "args", "expecteds"),
+    ("args", "return_value", "expected"),
     [
         pytest.param(
-            ["mypy", "pyright"],
-            ("--check", "mypy", "--check", "pyright -v", "--no-uvx", "src"),
-            [
-                (
-                    "mypy",
-                    *typecheck_runner._get_python_flags(
-                        "mypy",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                ),
-                (
-                    "pyright",
-                    "-v",
-                    *typecheck_runner._get_python_flags(
-                        "pyright",
-                        *typecheck_runner._get_python_values(None, None, False, False),
-                    ),
-                    "src",
-                ),
-            ],
-            id="mult",
+            ("--check", "mypy", "--check", "pyright", "--no-uvx", "--jobs", "2"),
+            0,
+            0,
+            id="jobs",
+        ),
+        pytest.param(
+            ("--check", "mypy", "--check", "pyright", "--no-uvx", "--jobs", "0"),
+            1,
+            2,
+            id="jobs cpu_count",
+        ),
+        pytest.param(
+            ("--check", "mypy", "--check", "pyright", "--no-uvx", "-j2", "--fail-fast"),
+            1,
+            1,
+            id="jobs fail_fast",
         ),
     ],
 )
-@pytest.mark.parametrize("fail_fast", [False, True])
-@patch("typecheck_runner.typecheck_runner._run_checker", autospec=True, return_value=1)
-@patch("typecheck_runner.typecheck_runner.shutil.which", side_effect=_identity)
-def test_main_fail_fast(
-    mocked_which: Any,  # ruff:ignore[unused-function-argument]
-    mocked_run_checker: Any,
-    checkers: list[str],
+def test_main_jobs(
+    monkeypatch: pytest.MonkeyPatch,
+    capfd: pytest.CaptureFixture[str],
     args: Sequence[str],
-    expecteds: list[Any],
-    fail_fast: bool,
+    return_value: int,
+    expected: int,
 ) -> None:
-    out = typecheck_runner.main([*args, *(["--fail-fast"] if fail_fast else [])])
-
+    fail_fast = "--fail-fast" in args
+
+    def _new_proc(*args: Any, **kwargs: Any) -> MagicMock:  # ruff:ignore[unused-function-argument]
+        proc = MagicMock()
+        proc.stdout = io.BytesIO(b"output\n")
+        proc.wait.return_value = return_value
+        # checkers still running when fail-fast stops are terminated
+        proc.poll.return_value = None if fail_fast else return_value
+        return proc
+
+    mocked_popen = MagicMock(side_effect=_new_proc)
+    terminate_checker = _RecordingStub(None)
+    monkeypatch.setattr("shutil.which", _identity_which)
+    monkeypatch.setattr(os, "cpu_count", MagicMock(return_value=2))
+    monkeypatch.setattr(subprocess, "Popen", mocked_popen)
+    monkeypatch.setattr(typecheck_runner, "_terminate_checker", terminate_checker)
+
+    assert typecheck_runner.main(args) == expected
+
+    out = capfd.readouterr().out
     if fail_fast:
-        expecteds = expecteds[:1]
-        checkers = checkers[:1]
+        assert out.startswith("output\n")
+    else:
+        assert out == "output\n" * 2
+        assert (
+            call(
+                ["mypy", *_MYPY_FLAGS],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+            in mocked_popen.call_args_list
+        )
+    assert bool(terminate_checker.call_args_list) == fail_fast
 
-    expects = expecteds[:1] if fail_fast else expecteds
 
-    assert out == len(expects)
-    assert mocked_run_checker.call_args_list == [
-        call(*e, dry_run=False) for checker, e in zip(checkers, expecteds, strict=True)
-    ]
+def _blocking_stdout(event: Event) -> MagicMock:
+    """Checker output which only ends once ``event`` is set."""
+
+    def _readlines() -> list[bytes]:
+        _ = event.wait(timeout=10)
+        return []
 
+    stdout = MagicMock()
+    stdout.__enter__.return_value.readlines.side_effect = _readlines
+    return stdout
 
-@patch("typecheck_runner.typecheck_runner._run_checker", autospec=True)
-def test_main_help(
-    mocked_run_checker: Any,
+
+def test_main_jobs_fail_fast_terminated_not_reported(
+    monkeypatch: pytest.MonkeyPatch, mocked_logger: MagicMock
 ) -> None:
-    assert typecheck_runner.main([]) == 2  # ruff:ignore[magic-value-comparison]
-    assert mocked_run_checker.call_args_list == []
+    slow_started, slow_terminated = Event(), Event()
+
+    def _popen(args: Sequence[str], **kwargs: Any) -> MagicMock:  # ruff:ignore[unused-function-argument]
+        proc = MagicMock()
+        if args[0] == "slow":
+            slow_started.set()
+            proc.stdout = _blocking_stdout(slow_terminated)
+            proc.terminate.side_effect = slow_terminated.set
+            proc.poll.return_value = None
+            proc.wait.return_value = -15
+        else:
+            # fail only once the slow checker is running
+            proc.stdout = _blocking_stdout(slow_started)
+            proc.poll.return_value = proc.wait.return_value = 1
+        return proc
+
+    def _terminate_checker(proc: MagicMock) -> None:
+        proc.terminate()
+
+    monkeypatch.setattr("shutil.which", _identity_which)
+    monkeypatch.setattr(subprocess, "Popen", _popen)
+    monkeypatch.setattr(typecheck_runner, "_terminate_checker", _terminate_checker)
+    args = ["-c", "fail", "-c", "slow", "--no-uvx", "-j2", "--fail-fast"]
+    args += ["--no-python-version", "--no-python-executable"]
+
+    assert typecheck_runner.main(args) == 1
+    assert slow_terminated.is_set()
+    # only the failing checker is reported, not the one killed by fail-fast
+    assert mocked_logger.error.call_count == 1
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs sh and process groups")
+def test_main_jobs_fail_fast_terminates_grandchild() -> None:
+    # ``:`` keeps sh from exec-ing sleep, so sleep is a grandchild holding the
+    # output pipe open
+    args = [
+        "-c",
+        "sh -c 'sleep 0.5; exit 1'",
+        "-c",
+        "sh -c 'echo; sleep 30; :'",
+        "--no-uvx",
+        "-j2",
+        "--fail-fast",
+        "--no-python-version",
+        "--no-python-executable",
+    ]
+    start_time = perf_counter()
+    assert typecheck_runner.main(args) == 1
+    assert perf_counter() - start_time < 10  # ruff:ignore[magic-value-comparison]
+
+
+@pytest.mark.parametrize("os_name", ["posix", "nt"])
+def test__terminate_checker(monkeypatch: pytest.MonkeyPatch, os_name: str) -> None:
+    proc = MagicMock(pid=123)
+    mocked_killpg = MagicMock(side_effect=ProcessLookupError)
+    monkeypatch.setattr(os, "name", os_name)
+    monkeypatch.setattr(os, "killpg", mocked_killpg, raising=False)
+
+    typecheck_runner._terminate_checker(proc)
+
+    if os_name == "posix":
+        mocked_killpg.assert_called_once_with(123, signal.SIGTERM)
+        assert not proc.terminate.called
+    else:
+        assert not mocked_killpg.called
+        proc.terminate.assert_called_once_with()
+
+
+@pytest.mark.parametrize("nlines", [0, 3, 40])
+def test__write_output(capfd: pytest.CaptureFixture[str], nlines: int) -> None:
+    lines = [f"line {i}\n".encode() for i in range(nlines)]
+    typecheck_runner._write_output(lines)
+    assert capfd.readouterr().out == b"".join(lines).decode()
+
+
+def test__write_output_no_fileno(monkeypatch: pytest.MonkeyPatch) -> None:
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    typecheck_runner._write_output([b"a\n", b"b\n"])
+    assert stdout.getvalue() == "a\nb\n"
+
 
+def test_get_parser_cached() -> None:
+    parser = typecheck_runner.get_parser()
+    assert typecheck_runner.get_parser() is parser
+    # append defaults are not shared between parses
+    assert parser.parse_args(["--check", "mypy"]).checkers == ["mypy"]
+    assert parser.parse_args([]).checkers == []
 
-@patch("typecheck_runner.typecheck_runner.print")
-def test_main_version(mocked_print: Any) -> None:
-    from typecheck_runner import __version__
 
+def test_main_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    mocked_print = _RecordingStub(None)
+    monkeypatch.setattr(typecheck_runner, "print", mocked_print, raising=False)
     assert typecheck_runner.main(["--version"]) == 0
-    mocked_print.assert_called_once_with("typecheck-runner", __version__)
+    assert mocked_print.call_args_list == [call("typecheck-runner", __version__)]
 
 
-@patch("typecheck_runner.typecheck_runner.main", return_value=0)
-def test__main__(mocked_main: Any) -> None:
-    with contextlib.suppress(SystemExit):
-        import typecheck_runner.__main__  # ruff:ignore[unused-import]
+def test__main__(monkeypatch: pytest.MonkeyPatch) -> None:
+    mocked_main = _RecordingStub(0)
+    monkeypatch.setattr(typecheck_runner, "main", mocked_main)
+    _ = sys.modules.pop("typecheck_runner.__main__", None)
+    with pytest.raises(SystemExit) as excinfo:
+        _ = runpy.run_module("typecheck_runner.__main__", run_name="__main__")
 
-        mocked_main.assert_called_once_with()
+    assert excinfo.value.code == 0
+    assert mocked_main.call_args_list == [call(replace_process=True)]